@@ -8,246 +8,301 @@ import argparse
 import re
 import sys
 import json
+from collections import Counter
+from functools import lru_cache
 
-def parse_gigamon_diag(file_path, output_format='table', show_summary=True):
+# Table columns are separated by runs of two or more whitespace characters
+_COLUMN_SPLIT = re.compile(r'\s{2,}').split
+_NUM_SPLIT = re.compile(r'(\d+)').split
+
+# "Speed (Mbps)" values as reported by the chassis -> display form
+_SPEED_MAP = {"1000": "1Gb", "10000": "10Gb", "40000": "40Gb", "100000": "100Gb"}
+
+# SFP type substrings that identify fiber optics, and values meaning no module
+_FIBER_RE = re.compile(r'sx|lx|sr|lr|er|zr')
+_NO_MODULE = frozenset({"none", "n/a", "(unsupported)"})
+
+# Display form -> line rate in bits per second
+_SPEED_BPS = {
+    "100Gb": 100_000_000_000,
+    "40Gb": 40_000_000_000,
+    "10Gb": 10_000_000_000,
+    "1Gb": 1_000_000_000,
+    "100Mb": 100_000_000,
+}
+
+@lru_cache(maxsize=None)
+def natural_keys(text):
+    """
+    Sort key that orders port IDs numerically (1/1/x2 before 1/1/x10).
+    Memoized, so each unique port ID is only tokenized once.
+    """
+    return tuple(int(c) if c.isdigit() else c for c in _NUM_SPLIT(text))
+
+def parse_gigamon_diag(file_path, output_format='table', show_summary=True, compact=False):
     """
     Parses a Gigamon 'show diag' file to extract port inventory.
     """
     
-    # Dictionaries to store data
+    # Per-port fields are kept as parallel lists indexed through port_index,
+    # so the hot parsing loops do list stores instead of nested dict lookups.
     port_aliases = {}
-    port_data = {}
+    port_index = {}
+    port_ids = []
+    types = []
+    admins = []
+    links = []
+    speeds = []
+    sfps = []
+    medias = []
+    rx_rates = []
+    tx_rates = []
+
+    alias_pattern = re.compile(r'^\s*port\s+([0-9]+/[0-9]+/[a-z0-9]+)\s+alias\s+(.+)')
+    # Header lines reach these already stripped and prefiltered on their
+    # keyword, so no leading-whitespace scan is needed.
+    header_pattern = re.compile(r'Parameter\s+(1/\d+/\S.*)')
+    stats_header_pattern = re.compile(r'Counter Name\s+(\S.*)')
+
+    # Rates are collected separately and merged once the whole file has been
+    # read, since the stats table may appear before the parameters table.
+    port_rx = {}
+    port_tx = {}
+
+    # Section state: None, 'running_config', 'port_params' or 'port_stats'
+    section = None
+    current_idx = []
+    current_stats_ports = []
 
     try:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
+            for line in f:
+                # --- Running Config: full aliases ---
+                # The section runs until the next table header; banner lines
+                # can appear inside the config, so they do not end it.
+                if "Running Configuration" in line:
+                    section = 'running_config'
+
+                # Cheap substring checks gate every regex, since almost no
+                # line in a diag file is an alias or a table header.
+                if section == 'running_config' and "alias" in line:
+                    match = alias_pattern.match(line)
+                    if match:
+                        port_id = match.group(1)
+                        alias = match.group(2).strip().replace('"', '')
+                        port_aliases[port_id] = alias
+                        continue
+
+                # Outside the tables only header lines matter, so skip the
+                # strip() allocation for everything else
+                if (section in (None, 'running_config')
+                        and "Parameter" not in line and "Counter Name" not in line):
+                    continue
+
+                line = line.strip()
+
+                # --- Port Parameters header ---
+                match = line.startswith("Parameter") and header_pattern.match(line)
+                if match:
+                    section = 'port_params'
+                    current_idx = []
+                    for p in _COLUMN_SPLIT(match.group(1)):
+                        idx = port_index.get(p)
+                        if idx is None:
+                            idx = port_index[p] = len(port_ids)
+                            port_ids.append(p)
+                            types.append("N/A")
+                            admins.append("N/A")
+                            links.append("N/A")
+                            speeds.append("N/A")
+                            sfps.append("N/A")
+                            medias.append("N/A")
+                            rx_rates.append("0")
+                            tx_rates.append("0")
+                        current_idx.append(idx)
+                    continue
+
+                # --- Port Statistics header ---
+                match = line.startswith("Counter Name") and stats_header_pattern.match(line)
+                if match:
+                    section = 'port_stats'
+                    raw_ports = _COLUMN_SPLIT(match.group(1))
+                    current_stats_ports = []
+                    for p_str in raw_ports:
+                        p_id = p_str.replace("Port:", "").strip()
+                        current_stats_ports.append(p_id)
+                    continue
+
+                if section in (None, 'running_config') or line.startswith("="):
+                    continue
+
+                parts = _COLUMN_SPLIT(line)
+                if len(parts) < 2: continue
+
+                label = parts[0].replace(":", "").strip()
+                values = parts[1:]
+
+                if section == 'port_params':
+                    if label == "Type":
+                        for idx, val in zip(current_idx, values):
+                            types[idx] = val.replace("(T)", "") if "(T)" in val else val
+                    elif label == "Admin":
+                        for idx, val in zip(current_idx, values):
+                            admins[idx] = val
+                    elif "Link status" in label:
+                        for idx, val in zip(current_idx, values):
+                            links[idx] = val
+                    elif label == "Speed (Mbps)":
+                        for idx, val in zip(current_idx, values):
+                            speeds[idx] = _SPEED_MAP.get(val, val)
+                    elif label == "SFP type":
+                        for idx, val in zip(current_idx, values):
+                            sfps[idx] = val
+                            media = "Unknown"
+                            val_lower = val.lower()
+                            if "cu" in val_lower or "copper" in val_lower: media = "Copper"
+                            elif _FIBER_RE.search(val_lower): media = "Fiber"
+                            elif "qsfp" in val_lower: media = "Fiber (QSFP)"
+                            elif val_lower in _NO_MODULE: media = "No Module"
+                            else: media = val
+                            medias[idx] = media
+
+                elif section == 'port_stats':
+                    if label == "IfInOctetsPerSec":
+                        port_rx.update(zip(current_stats_ports, values))
+                    elif label == "IfOutOctetsPerSec":
+                        port_tx.update(zip(current_stats_ports, values))
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.", file=sys.stderr)
         sys.exit(1)
 
-    # --- STEP 1: Parse Running Config for Full Aliases ---
-    in_running_config = False
-    alias_pattern = re.compile(r'^\s*port\s+([0-9]+/[0-9]+/[a-z0-9]+)\s+alias\s+(.+)')
-    
-    for line in lines:
-        if "Running Configuration" in line:
-            in_running_config = True
-        
-        if in_running_config:
-            match = alias_pattern.match(line)
-            if match:
-                port_id = match.group(1)
-                alias = match.group(2).strip().replace('"', '')
-                port_aliases[port_id] = alias
-
-    # --- STEP 2: Parse Port Parameters Table ---
-    current_ports = []
-    header_pattern = re.compile(r'^\s*Parameter\s+(1/\d+/\S+.*)')
-    
-    for line in lines:
-        line = line.strip()
-        
-        match = header_pattern.match(line)
-        if match:
-            current_ports = re.split(r'\s{2,}', match.group(1))
-            for p in current_ports:
-                if p not in port_data:
-                    port_data[p] = {
-                        "Type": "N/A", 
-                        "Admin": "N/A", 
-                        "Speed": "N/A", 
-                        "SFP": "N/A",
-                        "Media": "N/A",
-                        "RxRate": "0",
-                        "TxRate": "0"
-                    }
-            continue
-
-        if line.startswith("=") or not current_ports:
-            continue
-
-        parts = re.split(r'\s{2,}', line)
-        if len(parts) < 2: continue
-            
-        label = parts[0].replace(":", "").strip()
-        values = parts[1:]
-        
-        if label == "Type":
-            for i, val in enumerate(values):
-                if i < len(current_ports):
-                    port_data[current_ports[i]]["Type"] = val
-        elif label == "Admin":
-            for i, val in enumerate(values):
-                if i < len(current_ports):
-                    port_data[current_ports[i]]["Admin"] = val
-        elif "Link status" in label:
-            for i, val in enumerate(values):
-                if i < len(current_ports):
-                    port_data[current_ports[i]]["Link"] = val
-        elif label == "Speed (Mbps)":
-            for i, val in enumerate(values):
-                if i < len(current_ports):
-                    speed_val = val
-                    if val == "1000": speed_val = "1Gb"
-                    elif val == "10000": speed_val = "10Gb"
-                    elif val == "40000": speed_val = "40Gb"
-                    elif val == "100000": speed_val = "100Gb"
-                    port_data[current_ports[i]]["Speed"] = speed_val
-        elif label == "SFP type":
-            for i, val in enumerate(values):
-                if i < len(current_ports):
-                    port_data[current_ports[i]]["SFP"] = val
-                    media = "Unknown"
-                    val_lower = val.lower()
-                    if "cu" in val_lower or "copper" in val_lower: media = "Copper"
-                    elif any(x in val_lower for x in ['sx', 'lx', 'sr', 'lr', 'er', 'zr']): media = "Fiber"
-                    elif "qsfp" in val_lower: media = "Fiber (QSFP)"
-                    elif val_lower in ["none", "n/a", "(unsupported)"]: media = "No Module"
-                    else: media = val
-                    port_data[current_ports[i]]["Media"] = media
-
-    # --- STEP 2.5: Parse Port Statistics Table ---
-    current_stats_ports = []
-    stats_header_pattern = re.compile(r'^\s*Counter Name\s+(.*)')
-    
-    for line in lines:
-        line = line.strip()
-        match = stats_header_pattern.match(line)
-        if match:
-            raw_ports = re.split(r'\s{2,}', match.group(1))
-            current_stats_ports = []
-            for p_str in raw_ports:
-                p_id = p_str.replace("Port:", "").strip()
-                current_stats_ports.append(p_id)
-            continue
-
-        if line.startswith("=") or not current_stats_ports:
-            continue
-            
-        parts = re.split(r'\s{2,}', line)
-        if len(parts) < 2: continue
-        
-        label = parts[0].replace(":", "").strip()
-        values = parts[1:]
-        
-        if label == "IfInOctetsPerSec":
-            for i, val in enumerate(values):
-                if i < len(current_stats_ports):
-                    p = current_stats_ports[i]
-                    if p in port_data:
-                        port_data[p]["RxRate"] = val
-        elif label == "IfOutOctetsPerSec":
-            for i, val in enumerate(values):
-                if i < len(current_stats_ports):
-                    p = current_stats_ports[i]
-                    if p in port_data:
-                        port_data[p]["TxRate"] = val
+    for p, val in port_rx.items():
+        if p in port_index:
+            rx_rates[port_index[p]] = val
+    for p, val in port_tx.items():
+        if p in port_index:
+            tx_rates[port_index[p]] = val
 
     # --- STEP 3: Formatting Output ---
     
-    def calc_util(rate_str, speed_str):
+    def calc_util(rate_str, speed_bps):
         try:
             rate = float(rate_str)
-            if speed_str in ["N/A", "Unknown", "-"]: return 0.0
-            
-            # Rough speed mapping based on standard Gigamon output
-            speed_bps = 0
-            if "100Gb" in speed_str: speed_bps = 100_000_000_000
-            elif "40Gb" in speed_str: speed_bps = 40_000_000_000
-            elif "10Gb" in speed_str: speed_bps = 10_000_000_000
-            elif "1Gb" in speed_str: speed_bps = 1_000_000_000
-            elif "100Mb" in speed_str: speed_bps = 100_000_000
-            else: return 0.0
-            
-            # (Bytes * 8) / Speed
-            if speed_bps == 0: return 0.0
-            util = (rate * 8 * 100) / speed_bps
-            return util
         except (ValueError, TypeError):
             return 0.0
+        # (Bytes * 8) / Speed
+        return (rate * 8 * 100) / speed_bps
 
-    def natural_keys(text):
-        return [int(c) if c.isdigit() else c for c in re.split(r'(\d+)', text)]
+    sorted_ports = sorted(port_ids, key=natural_keys)
+    sort_order = [port_index[p] for p in sorted_ports]
 
-    sorted_ports = sorted(port_data.keys(), key=natural_keys)
+    # Utilization for every port, computed once in one pass over the lists
+    rx_utils = [0.0] * len(port_ids)
+    tx_utils = [0.0] * len(port_ids)
+    for idx, speed in enumerate(speeds):
+        # Rough speed mapping based on standard Gigamon output
+        speed_bps = _SPEED_BPS.get(speed)
+        if speed_bps:
+            rx_utils[idx] = calc_util(rx_rates[idx], speed_bps)
+            tx_utils[idx] = calc_util(tx_rates[idx], speed_bps)
     
+    # Status tallies for the summaries, one pass each
+    admin_counts = Counter(a.lower() for a in admins)
+    link_counts = Counter(link.lower() for link in links)
+
     if output_format == 'json':
-        output = []
-        for port in sorted_ports:
-            data = port_data[port]
-            rx_util = calc_util(data["RxRate"], data["Speed"])
-            tx_util = calc_util(data["TxRate"], data["Speed"])
-            output.append({
+        output = [None] * len(sort_order)
+        for n, idx in enumerate(sort_order):
+            port = port_ids[idx]
+            output[n] = {
                 "port": port,
-                "type": data["Type"].replace("(T)", ""),
+                "type": types[idx],
                 "alias": port_aliases.get(port, ""),
-                "admin_status": data["Admin"].capitalize(),
-                "link_status": data.get("Link", "N/A").capitalize(),
-                "speed": data["Speed"],
-                "media": data["Media"],
-                "rx_util_pct": round(rx_util, 4),
-                "tx_util_pct": round(tx_util, 4)
-            })
-        print(json.dumps(output, indent=2))
+                "admin_status": admins[idx].capitalize(),
+                "link_status": links[idx].capitalize(),
+                "speed": speeds[idx],
+                "media": medias[idx],
+                "rx_util_pct": round(rx_utils[idx], 4),
+                "tx_util_pct": round(tx_utils[idx], 4)
+            }
+        if compact:
+            # json.dumps (not json.dump) so the C encoder is used
+            print(json.dumps(output, separators=(',', ':')))
+        else:
+            print(json.dumps(output, indent=2))
         
     elif output_format == 'csv':
-        print("Port,Type,Alias,Admin Status,Link Status,Speed,Media,RxUtil%,TxUtil%")
-        for port in sorted_ports:
-            data = port_data[port]
-            alias = port_aliases.get(port, "").replace(",", ";")
-            p_type = data["Type"].replace("(T)", "")
-            admin_status = data["Admin"].capitalize()
-            link_status = data.get("Link", "N/A").capitalize()
+        rows = ["Port,Type,Alias,Admin Status,Link Status,Speed,Media,RxUtil%,TxUtil%"]
+        append = rows.append
+        csv_aliases = {p: a.replace(",", ";") for p, a in port_aliases.items()}
+        for idx in sort_order:
+            port = port_ids[idx]
+            alias = csv_aliases.get(port, "")
+            p_type = types[idx]
+            admin_status = admins[idx].capitalize()
+            link_status = links[idx].capitalize()
             
-            rx_util = calc_util(data["RxRate"], data["Speed"])
-            tx_util = calc_util(data["TxRate"], data["Speed"])
+            rx_util = rx_utils[idx]
+            tx_util = tx_utils[idx]
             
-            print(f'{port},{p_type},"{alias}",{admin_status},{link_status},{data["Speed"]},{data["Media"]},{rx_util:.4f},{tx_util:.4f}')
+            append(f'{port},{p_type},"{alias}",{admin_status},{link_status},{speeds[idx]},{medias[idx]},{rx_util:.4f},{tx_util:.4f}')
         
         # Add summary rows
-        enabled_count = sum(1 for p in port_data.values() if p["Admin"].lower() == "enabled")
-        disabled_count = sum(1 for p in port_data.values() if p["Admin"].lower() == "disabled")
-        link_up_count = sum(1 for p in port_data.values() if p.get("Link", "").lower() == "up")
-        link_down_count = sum(1 for p in port_data.values() if p.get("Link", "").lower() == "down")
-        
-        print("")
-        print(f"SUMMARY,,,,,,,,")
-        print(f"Total Ports,{len(port_data)},,,,,,,")
-        print(f"Admin Enabled,{enabled_count},,,,,,,")
-        print(f"Admin Disabled,{disabled_count},,,,,,,")
-        print(f"Link Up,{link_up_count},,,,,,,")
-        print(f"Link Down,{link_down_count},,,,,,,")
+        append("")
+        append(f"SUMMARY,,,,,,,,")
+        append(f"Total Ports,{len(port_ids)},,,,,,,")
+        append(f"Admin Enabled,{admin_counts['enabled']},,,,,,,")
+        append(f"Admin Disabled,{admin_counts['disabled']},,,,,,,")
+        append(f"Link Up,{link_counts['up']},,,,,,,")
+        append(f"Link Down,{link_counts['down']},,,,,,,")
+        append("")
+        sys.stdout.write("\n".join(rows))
             
     else:  # table format
-        print(f"{'Port':<10} {'Type':<12} {'Alias':<30} {'Admin':<8} {'Link':<8} {'Speed':<6} {'Media':<10} {'RxUtil%':<8} {'TxUtil%':<8}")
-        print("-" * 115)
+        rows = [
+            f"{'Port':<10} {'Type':<12} {'Alias':<30} {'Admin':<8} {'Link':<8} {'Speed':<6} {'Media':<10} {'RxUtil%':<8} {'TxUtil%':<8}",
+            "-" * 115
+        ]
+        append = rows.append
 
-        for port in sorted_ports:
-            data = port_data[port]
+        for idx in sort_order:
+            port = port_ids[idx]
             alias = port_aliases.get(port, "-")
-            admin_status = data["Admin"].capitalize()
-            link_status = data.get("Link", "N/A").capitalize()
-            p_type = data["Type"].replace("(T)", "")
+            admin_status = admins[idx].capitalize()
+            link_status = links[idx].capitalize()
+            p_type = types[idx]
             
-            rx_util = calc_util(data["RxRate"], data["Speed"])
-            tx_util = calc_util(data["TxRate"], data["Speed"])
+            rx_util = rx_utils[idx]
+            tx_util = tx_utils[idx]
             
             rx_str = f"{rx_util:.2f}%" if rx_util > 0 else "0%"
             tx_str = f"{tx_util:.2f}%" if tx_util > 0 else "0%"
 
-            print(f"{port:<10} {p_type:<12} {alias:<30} {admin_status:<8} {link_status:<8} {data['Speed']:<6} {data['Media']:<10} {rx_str:<8} {tx_str:<8}")
+            append(f"{port:<10} {p_type:<12} {alias:<30} {admin_status:<8} {link_status:<8} {speeds[idx]:<6} {medias[idx]:<10} {rx_str:<8} {tx_str:<8}")
+
+        append("")
+        sys.stdout.write("\n".join(rows))
 
     # --- Summary ---
     if show_summary and output_format == 'table':
         print("\n--- Summary ---")
-        enabled_count = sum(1 for p in port_data.values() if p["Admin"].lower() == "enabled")
-        disabled_count = sum(1 for p in port_data.values() if p["Admin"].lower() == "disabled")
-        link_up_count = sum(1 for p in port_data.values() if p.get("Link", "").lower() == "up")
-        
-        print(f"Total Ports:    {len(port_data)}")
-        print(f"Admin Enabled:  {enabled_count}")
-        print(f"Link Up:        {link_up_count}")
+        print(f"Total Ports:    {len(port_ids)}")
+        print(f"Admin Enabled:  {admin_counts['enabled']}")
+        print(f"Link Up:        {link_counts['up']}")
     
+    # Callers get the familiar per-port dictionaries
+    port_data = {}
+    for idx, port in enumerate(port_ids):
+        port_data[port] = {
+            "Type": types[idx],
+            "Admin": admins[idx],
+            "Link": links[idx],
+            "Speed": speeds[idx],
+            "SFP": sfps[idx],
+            "Media": medias[idx],
+            "RxRate": rx_rates[idx],
+            "TxRate": tx_rates[idx]
+        }
     return port_data
 
 def main():
@@ -260,14 +315,18 @@ def main():
     parser.add_argument('file', help='Path to the Gigamon show diag file')
     parser.add_argument('-f', '--format', choices=['table', 'csv', 'json'], default='table', help='Output format')
     parser.add_argument('--no-summary', action='store_true', help='Hide the summary counts')
+    parser.add_argument('--compact', action='store_true', help='Emit JSON without indentation (only with --format json)')
     parser.add_argument('-v', '--version', action='version', version='%(prog)s 1.1.0')
     
     args = parser.parse_args()
+    if args.compact and args.format != 'json':
+        parser.error('--compact is only valid with --format json')
     
     parse_gigamon_diag(
         file_path=args.file,
         output_format=args.format,
-        show_summary=not args.no_summary
+        show_summary=not args.no_summary,
+        compact=args.compact
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""
+Regression tests for gigamon_parser, run with: python -m unittest
+"""
+
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gigamon_parser import parse_gigamon_diag
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def run_parser(name, output_format):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        parse_gigamon_diag(os.path.join(FIXTURES, name), output_format=output_format)
+    return out.getvalue()
+
+
+class MultiBlockDiagTest(unittest.TestCase):
+    """
+    Tables split into several blocks separated by blank lines, with the
+    running config (and a banner inside it) between the blocks.
+    Expected output was produced by the original three-pass parser.
+    """
+
+    def check(self, output_format):
+        expected_path = os.path.join(FIXTURES, f'multi_block_diag.{output_format}.expected')
+        with open(expected_path, encoding='utf-8') as f:
+            expected = f.read()
+        self.assertEqual(run_parser('multi_block_diag.txt', output_format), expected)
+
+    def test_table(self):
+        self.check('table')
+
+    def test_csv(self):
+        self.check('csv')
+
+    def test_json(self):
+        self.check('json')
+
+
+if __name__ == '__main__':
+    unittest.main()